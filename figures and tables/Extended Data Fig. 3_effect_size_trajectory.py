@@ -12,12 +12,16 @@ using symmetric rolling windows of ±5, ±10, and ±15 years to assess
 the temporal robustness of the estimated effects.
 
 This figure corresponds to Extended Data Fig. 3 in the manuscript.
+
+The meta-table is streamed row group by row group; it is assumed to use
+~100k-row row groups (see method/rechunk_meta.py).
 """
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
-import statsmodels.api as sm
 import matplotlib.pyplot as plt
 from pathlib import Path
 
@@ -90,6 +94,51 @@ print(f">>> Loaded {len(df):,} observations")
 # STEP 2: ROLLING REGRESSIONS
 # =========================
 
+def ols_hc3(X, y, XtX, Xty):
+    """
+    OLS coefficients and HC3 standard errors for a dense design matrix.
+
+    XtX and Xty are the window's cross-products (taken from the yearly
+    prefix sums below). Equivalent to sm.OLS(y, X).fit(cov_type="HC3")
+    for full-rank X, without the per-call statsmodels overhead.
+    """
+    XtX_inv = np.linalg.inv(XtX)
+    beta = XtX_inv @ Xty
+    e = y - X @ beta
+    h = np.einsum("ij,jk,ik->i", X, XtX_inv, X)
+    w = (e / (1.0 - h)) ** 2
+    meat = (X * w[:, None]).T @ X
+    cov = XtX_inv @ meat @ XtX_inv
+    return beta, np.sqrt(np.diag(cov))
+
+
+# Complete cases, sorted by year: every window is a contiguous slice
+df = df.dropna().sort_values("sci_Year", kind="stable")
+
+years = df["sci_Year"].to_numpy(dtype=np.float64)
+X_all = np.column_stack([
+    np.ones(len(df)),
+    df["textual_disruption"].to_numpy(dtype=np.float64),
+    df["combo_novelty"].to_numpy(dtype=np.float64),
+])
+y_all = np.log1p(df["sci_Citation_Count"].to_numpy(dtype=np.float64))
+
+# row_bounds[j] = first row with year >= YEAR_MIN + j
+row_bounds = np.searchsorted(years, np.arange(YEAR_MIN, YEAR_MAX + 2))
+
+# Prefix sums over years: cumXtX[j] = sum of x_i x_i' for year < YEAR_MIN + j,
+# so any window's X'X / X'y is a difference of two entries.
+n_years = YEAR_MAX - YEAR_MIN + 1
+k = X_all.shape[1]
+cumXtX = np.zeros((n_years + 1, k, k))
+cumXty = np.zeros((n_years + 1, k))
+
+for j in range(n_years):
+    Xj = X_all[row_bounds[j]:row_bounds[j + 1]]
+    yj = y_all[row_bounds[j]:row_bounds[j + 1]]
+    cumXtX[j + 1] = cumXtX[j] + Xj.T @ Xj
+    cumXty[j + 1] = cumXty[j] + Xj.T @ yj
+
 records = []
 print(">>> Running rolling-window regressions...")
 
@@ -97,41 +146,41 @@ for w in ROLLING_WINDOWS:
     print(f"--- Symmetric rolling window: ±{w} years ---")
 
     for center_year in range(YEAR_MIN + w, YEAR_MAX - w):
-        sub = df[
-            (df["sci_Year"] >= center_year - w)
-            & (df["sci_Year"] <= center_year + w)
-        ].dropna()
+        j0 = center_year - w - YEAR_MIN
+        j1 = center_year + w - YEAR_MIN + 1
+        lo, hi = row_bounds[j0], row_bounds[j1]
+        n = hi - lo
 
-        if len(sub) < MIN_N:
+        if n < MIN_N:
             continue
 
-        X = sm.add_constant(
-            sub[["textual_disruption", "combo_novelty"]],
-            has_constant="add",
-        )
-        y = np.log1p(sub["sci_Citation_Count"])
-
         try:
-            res = sm.OLS(y, X).fit(cov_type="HC3")
-            records.append(
-                {
-                    "center_year": center_year,
-                    "window": w,
-                    "beta": res.params["textual_disruption"],
-                    "se": res.bse["textual_disruption"],
-                    "n": len(sub),
-                }
+            beta, se = ols_hc3(
+                X_all[lo:hi],
+                y_all[lo:hi],
+                cumXtX[j1] - cumXtX[j0],
+                cumXty[j1] - cumXty[j0],
             )
-        except Exception:
+        except np.linalg.LinAlgError:
             continue
 
+        records.append(
+            {
+                "center_year": center_year,
+                "window": w,
+                "beta": beta[1],
+                "se": se[1],
+                "n": n,
+            }
+        )
+
 # =========================
 # STEP 3: SAVE RESULTS
 # =========================
 
 results_df = pd.DataFrame(records)
 csv_path = OUTDIR / "extdata_fig3_rolling_effects.csv"
-results_df.to_csv(csv_path, index=False)
+pacsv.write_csv(pa.Table.from_pandas(results_df, preserve_index=False), csv_path)
 
 print(f">>> Saved results to {csv_path}")
 
@@ -13,12 +13,16 @@ This script generates:
 
 All models are estimated using:
 - Streaming OLS over a large Parquet meta-table
+- A float32 design matrix precomputed once and shared by all models
 - HC3 heteroskedasticity-robust standard errors
 - Year-centered interaction terms
 - Log-transformed control variables
 
 The implementation is designed to be memory-safe for
-datasets with tens of millions of observations.
+datasets with tens of millions of observations. It assumes
+meta_table.parquet uses ~100k-row row groups (see
+method/rechunk_meta.py), which bounds the size of each
+decoded batch.
 
 Author: 
 """
@@ -28,10 +32,14 @@ Author:
 # =========================================================
 
 import os
-import math
+import tempfile
 import numpy as np
 import pandas as pd
-import pyarrow.parquet as pq
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+from scipy.linalg import LinAlgError, cho_factor, cho_solve, solve_triangular
+from scipy.special import erfc
 from datetime import datetime
 
 # =========================================================
@@ -42,6 +50,13 @@ PARQUET_PATH = "meta_table.parquet"   # unified meta-table
 OUT_DIR = "tables_output"
 os.makedirs(OUT_DIR, exist_ok=True)
 
+# Rows per block when streaming the precomputed float32 design matrix
+# (written to a temporary directory under $TMPDIR, removed after the run)
+CHUNK_ROWS = 200_000
+
+# Parquet scan: rows per decoded batch
+SCAN_BATCH_ROWS = 200_000
+
 STAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
 OUT_FILE = os.path.join(
     OUT_DIR,
@@ -83,6 +98,29 @@ READ_COLS = list(set(
     + list(DEP_MAP.values())
 ))
 
+# Columns every model requires (rows missing any are dropped at scan time)
+COMMON_COLS = [YEAR_COL] + CTRL_RAW
+
+# All model inputs are read as float64
+READ_SCHEMA = pa.schema([(c, pa.float64()) for c in READ_COLS])
+
+# Engineered dependent variables (log1p for citation counts)
+DEP_Y = {
+    "sci_C10":            "Y_c10",
+    "sci_Citation_Count": "Y_cit",
+    "sci_Disruption":     "Y_disr",
+}
+
+# Column layout of the precomputed design matrix
+DESIGN_COLS = (
+    list(DEP_Y.values())
+    + ["Year_c"]
+    + CTRL_LOG
+    + GEN_VARS
+    + PERF_VARS
+    + [f"{v}_x_year" for v in GEN_VARS + PERF_VARS]
+)
+
 # =========================================================
 # Utility functions
 # =========================================================
@@ -91,219 +129,321 @@ def safe_numeric(series):
     """Convert to numeric safely."""
     return pd.to_numeric(series, errors="coerce")
 
-def normal_cdf(x):
-    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
-
-def two_sided_pvalue(t):
-    return 2.0 * (1.0 - normal_cdf(abs(t)))
-
-# =========================================================
-# Core function: Streaming OLS with HC3
-# =========================================================
+def scan_filter(schema):
+    """
+    Arrow filter expression for rows usable by at least one model.
 
-def streaming_ols_hc3(parquet_path, dep_var, x_vars, model_label):
+    Rows with a null (or NaN) year or control are removed inside the
+    Arrow scan via the validity bitmaps, before any conversion to NumPy.
+    When the year is stored numerically the 1900-2021 window is pushed
+    down as well.
     """
-    Estimate OLS with HC3 standard errors using streaming Parquet reads.
+    expr = None
+    for c in COMMON_COLS:
+        valid = ~ds.field(c).is_null(nan_is_null=True)
+        expr = valid if expr is None else expr & valid
 
-    Parameters
-    ----------
-    parquet_path : str
-        Path to the meta-table Parquet file.
-    dep_var : str
-        Dependent variable column name.
-    x_vars : list
-        List of main explanatory variables.
-    model_label : str
-        Label for model identification.
+    year_type = schema.field(YEAR_COL).type
+    if pa.types.is_integer(year_type) or pa.types.is_floating(year_type):
+        expr &= (ds.field(YEAR_COL) >= 1900) & (ds.field(YEAR_COL) <= 2021)
 
-    Returns
-    -------
-    list of dict
-        Regression results in tidy format.
+    return expr
+
+def iter_numeric_batches(parquet_path):
     """
+    Yield the meta-table as dicts of float64 arrays keyed by READ_COLS.
 
-    pf = pq.ParquetFile(parquet_path)
-    stats = None
-    x_names_ref = None
+    Batches come from Arrow's threaded scanner with pre-buffering, so
+    I/O and decompression overlap with the caller's computation. The
+    cast runs in Arrow; values it cannot parse (malformed strings) fall
+    back to pandas coercion to NaN.
+    """
+    dataset = ds.dataset(parquet_path, format="parquet")
+    scanner = dataset.scanner(
+        columns=READ_COLS,
+        filter=scan_filter(dataset.schema),
+        batch_size=SCAN_BATCH_ROWS,
+        use_threads=True,
+        fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True),
+    )
 
-    # =========================
-    # PASS 0: Mean & Std
-    # =========================
-    for rg in range(pf.num_row_groups):
-        df = pf.read_row_group(rg, columns=READ_COLS).to_pandas()
-        for c in df.columns:
-            df[c] = safe_numeric(df[c])
+    for batch in scanner.to_batches():
+        tbl = pa.Table.from_batches([batch]).select(READ_COLS)
+        try:
+            tbl = tbl.cast(READ_SCHEMA, safe=False)
+            yield {
+                c: tbl[c].to_numpy().astype(np.float64, copy=False)
+                for c in READ_COLS
+            }
+        except pa.ArrowInvalid:
+            df = tbl.to_pandas()
+            yield {
+                c: safe_numeric(df[c]).to_numpy(dtype=np.float64)
+                for c in READ_COLS
+            }
 
-        df = df[df[YEAR_COL].between(1900, 2021)]
-        if df.empty:
-            continue
+def build_design_block(cols, out):
+    """
+    Write the engineered model columns for one batch into `out`.
 
-        df["Year_c"] = df[YEAR_COL] - 1980.0
-        df["ctrl_team"] = np.log1p(df["sci_Team_Size"])
-        df["ctrl_inst"] = np.log1p(df["sci_Institution_Count"])
-        df["ctrl_refs"] = np.log1p(df["sci_Reference_Count"])
+    Each DESIGN_COLS column is computed straight into its float32 slot
+    of the preallocated block (ufunc `out=`), so no intermediate
+    DataFrame columns are materialized.
+    """
+    j = {name: i for i, name in enumerate(DESIGN_COLS)}
+    year_c = cols[YEAR_COL] - 1980.0
 
+    for dep_var, y_col in DEP_Y.items():
         if dep_var == "sci_Disruption":
-            df["Y"] = df[dep_var]
+            out[:, j[y_col]] = cols[dep_var]
         else:
-            df["Y"] = np.log1p(df[dep_var])
-
-        for v in x_vars:
-            df[f"{v}_x_year"] = df[v] * df["Year_c"]
-
-        x_names = (
-            x_vars +
-            ["Year_c"] +
-            CTRL_LOG +
-            [f"{v}_x_year" for v in x_vars]
-        )
+            np.log1p(cols[dep_var], out=out[:, j[y_col]], casting="same_kind")
 
-        dft = df[["Y"] + x_names].dropna()
-        if dft.empty:
-            continue
+    out[:, j["Year_c"]] = year_c
 
-        M = dft.to_numpy(dtype=np.float64)
+    for raw, name in zip(CTRL_RAW, CTRL_LOG):
+        np.log1p(cols[raw], out=out[:, j[name]], casting="same_kind")
 
-        if stats is None:
-            stats = {
-                "n": 0,
-                "sum": np.zeros(M.shape[1]),
-                "sumsq": np.zeros(M.shape[1]),
-            }
-            x_names_ref = x_names
-
-        stats["n"] += M.shape[0]
-        stats["sum"] += M.sum(axis=0)
-        stats["sumsq"] += (M * M).sum(axis=0)
+    for v in GEN_VARS + PERF_VARS:
+        out[:, j[v]] = cols[v]
+        np.multiply(
+            cols[v], year_c, out=out[:, j[f"{v}_x_year"]], casting="same_kind"
+        )
 
-    mean = stats["sum"] / stats["n"]
-    var = stats["sumsq"] / stats["n"] - mean * mean
-    std = np.sqrt(np.maximum(var, 1e-12))
+def precompute_design(parquet_path, design_dir):
+    """
+    Stream the meta-table once and write all engineered model columns
+    to a contiguous float32 matrix.
 
-    y_mean, y_std = mean[0], std[0]
-    X_mean, X_std = mean[1:], std[1:]
-    N = stats["n"]
+    Rows are restricted to 1900-2021; missing values are kept as NaN and
+    dropped per model.
 
-    # =========================
-    # PASS 1: OLS
-    # =========================
-    k = 1 + len(x_names_ref)
-    XtX = np.zeros((k, k))
-    Xty = np.zeros(k)
-    sumy = 0.0
-    sumy2 = 0.0
-
-    for rg in range(pf.num_row_groups):
-        df = pf.read_row_group(rg, columns=READ_COLS).to_pandas()
-        for c in df.columns:
-            df[c] = safe_numeric(df[c])
-
-        df = df[df[YEAR_COL].between(1900, 2021)]
-        if df.empty:
-            continue
-
-        df["Year_c"] = df[YEAR_COL] - 1980.0
-        df["ctrl_team"] = np.log1p(df["sci_Team_Size"])
-        df["ctrl_inst"] = np.log1p(df["sci_Institution_Count"])
-        df["ctrl_refs"] = np.log1p(df["sci_Reference_Count"])
+    Returns
+    -------
+    numpy.memmap
+        Read-only (n_rows, len(DESIGN_COLS)) float32 matrix.
+    """
+    data_path = os.path.join(design_dir, "design.f32")
 
-        if dep_var == "sci_Disruption":
-            df["Y"] = df[dep_var]
-        else:
-            df["Y"] = np.log1p(df[dep_var])
+    n_rows = 0
 
-        for v in x_vars:
-            df[f"{v}_x_year"] = df[v] * df["Year_c"]
+    with open(data_path, "wb") as f:
+        for cols in iter_numeric_batches(parquet_path):
+            year = cols[YEAR_COL]
+            keep = (year >= 1900) & (year <= 2021)
+            if not keep.any():
+                continue
 
-        dft = df[["Y"] + x_names_ref].dropna()
-        if dft.empty:
-            continue
+            cols = {c: a[keep] for c, a in cols.items()}
 
-        y = dft["Y"].to_numpy()
-        Xraw = dft[x_names_ref].to_numpy()
+            M = np.empty((int(keep.sum()), len(DESIGN_COLS)), dtype=np.float32)
+            build_design_block(cols, M)
+            f.write(M.tobytes())
+            n_rows += M.shape[0]
 
-        yZ = (y - y_mean) / y_std
-        XZ = (Xraw - X_mean) / X_std
-        X = np.hstack([np.ones((XZ.shape[0], 1)), XZ])
+    return np.memmap(
+        data_path, dtype=np.float32, mode="r",
+        shape=(n_rows, len(DESIGN_COLS)),
+    )
 
-        XtX += X.T @ X
-        Xty += X.T @ yZ
-        sumy += yZ.sum()
-        sumy2 += (yZ * yZ).sum()
+def iter_design_chunks(design):
+    """
+    Yield consecutive float64 row blocks of the full design matrix.
+    """
+    for start in range(0, design.shape[0], CHUNK_ROWS):
+        yield design[start:start + CHUNK_ROWS].astype(np.float64)
 
-    XtX_inv = np.linalg.pinv(XtX)
-    beta = XtX_inv @ Xty
+def model_rows(chunk, ci, model):
+    """
+    Complete-case rows of one model's columns [Y, x_names] in chunk ci.
 
-    # =========================
-    # PASS 2: HC3
-    # =========================
-    meat = np.zeros((k, k))
-    SSE = 0.0
-    ybar = sumy / N
-    TSS = sumy2 - N * ybar * ybar
+    The validity mask is computed on the first pass and cached bit-packed
+    (one bit per row); later passes unpack it instead of re-scanning.
+    """
+    masks = model["masks"]
+    if ci == len(masks):
+        mask = np.isfinite(chunk[:, model["cols"]]).all(axis=1)
+        masks.append(np.packbits(mask))
+    else:
+        mask = np.unpackbits(masks[ci], count=chunk.shape[0]).view(np.bool_)
+    return chunk[np.ix_(mask, model["cols"])]
+
+def model_xy(M, model):
+    """
+    Z-scored outcome and design matrix (with intercept) for one model.
 
-    for rg in range(pf.num_row_groups):
-        df = pf.read_row_group(rg, columns=READ_COLS).to_pandas()
-        for c in df.columns:
-            df[c] = safe_numeric(df[c])
+    X is allocated once and z-scored in place (subtract, then multiply
+    by the precomputed 1/std), with no intermediate arrays or hstack.
+    """
+    X = np.empty_like(M)
+    X[:, 0] = 1.0
+    XZ = X[:, 1:]
+    np.subtract(M[:, 1:], model["X_mean"], out=XZ)
+    XZ *= model["X_scale"]
 
-        df = df[df[YEAR_COL].between(1900, 2021)]
-        if df.empty:
-            continue
+    yZ = M[:, 0] - model["y_mean"]
+    yZ *= model["y_scale"]
+    return yZ, X
 
-        df["Year_c"] = df[YEAR_COL] - 1980.0
-        df["ctrl_team"] = np.log1p(df["sci_Team_Size"])
-        df["ctrl_inst"] = np.log1p(df["sci_Institution_Count"])
-        df["ctrl_refs"] = np.log1p(df["sci_Reference_Count"])
+# =========================================================
+# Core function: Streaming OLS with HC3
+# =========================================================
 
-        if dep_var == "sci_Disruption":
-            df["Y"] = df[dep_var]
-        else:
-            df["Y"] = np.log1p(df[dep_var])
+def streaming_ols_hc3_multi(design, models):
+    """
+    Estimate several OLS models with HC3 standard errors in three
+    shared passes over the precomputed design.
 
-        for v in x_vars:
-            df[f"{v}_x_year"] = df[v] * df["Year_c"]
+    Every pass reads each design chunk once and updates the
+    accumulators of all models, so the number of passes does not grow
+    with the number of models. All sums and cross-products are
+    accumulated in float64.
 
-        dft = df[["Y"] + x_names_ref].dropna()
-        if dft.empty:
-            continue
+    Parameters
+    ----------
+    design : numpy.memmap
+        Float32 design matrix with columns DESIGN_COLS.
+    models : list of tuple
+        (dep_var, x_vars, model_label) for each model.
 
-        y = dft["Y"].to_numpy()
-        Xraw = dft[x_names_ref].to_numpy()
+    Returns
+    -------
+    list of dict
+        Regression results in tidy format, in the order of `models`.
+    """
 
-        yZ = (y - y_mean) / y_std
-        XZ = (Xraw - X_mean) / X_std
-        X = np.hstack([np.ones((XZ.shape[0], 1)), XZ])
+    states = []
+    for dep_var, x_vars, model_label in models:
+        x_names = (
+            x_vars +
+            ["Year_c"] +
+            CTRL_LOG +
+            [f"{v}_x_year" for v in x_vars]
+        )
+        cols = [DESIGN_COLS.index(c) for c in [DEP_Y[dep_var]] + x_names]
+        states.append({
+            "dep_var": dep_var,
+            "label": model_label,
+            "x_names": x_names,
+            "cols": cols,
+            "masks": [],
+            "n": 0,
+            "mean": np.zeros(len(cols)),
+            "M2": np.zeros(len(cols)),
+        })
 
-        e = yZ - X @ beta
-        SSE += (e * e).sum()
+    # =========================
+    # PASS 0: Mean & Std
+    # =========================
+    # Chunk moments are merged with Chan et al.'s parallel update, which
+    # avoids the cancellation in sumsq / n - mean^2 for large-valued columns.
+    for ci, chunk in enumerate(iter_design_chunks(design)):
+        for m in states:
+            M = model_rows(chunk, ci, m)
+            n_b = M.shape[0]
+            if n_b == 0:
+                continue
+
+            mean_b = M.mean(axis=0)
+            M2_b = np.square(M - mean_b).sum(axis=0)
+
+            n = m["n"] + n_b
+            delta = mean_b - m["mean"]
+            m["mean"] += delta * (n_b / n)
+            m["M2"] += M2_b + delta * delta * (m["n"] * n_b / n)
+            m["n"] = n
+
+    for m in states:
+        mean = m["mean"]
+        var = m["M2"] / m["n"]
+        std = np.sqrt(np.maximum(var, 1e-12))
+
+        m["y_mean"], m["y_scale"] = mean[0], 1.0 / std[0]
+        m["X_mean"], m["X_scale"] = mean[1:], 1.0 / std[1:]
+
+        k = len(m["cols"])
+        m["XtX"] = np.zeros((k, k))
+        m["Xty"] = np.zeros(k)
+        m["sumy"] = 0.0
+        m["sumy2"] = 0.0
 
-        H = X @ XtX_inv
-        h = np.sum(H * X, axis=1)
-        w = (e * e) / np.square(1.0 - h)
-        Xw = X * np.sqrt(np.nan_to_num(w))[:, None]
-        meat += Xw.T @ Xw
+    # =========================
+    # PASS 1: OLS
+    # =========================
+    for ci, chunk in enumerate(iter_design_chunks(design)):
+        for m in states:
+            yZ, X = model_xy(model_rows(chunk, ci, m), m)
+
+            m["XtX"] += X.T @ X
+            m["Xty"] += X.T @ yZ
+            m["sumy"] += yZ.sum()
+            m["sumy2"] += (yZ * yZ).sum()
+
+    for m in states:
+        k = len(m["cols"])
+
+        # X'X is well conditioned after z-scoring: solve via Cholesky,
+        # falling back to the pseudo-inverse if it is not positive definite.
+        try:
+            m["chol"] = cho_factor(m["XtX"], lower=True)
+            m["beta"] = cho_solve(m["chol"], m["Xty"])
+            m["XtX_inv"] = cho_solve(m["chol"], np.eye(k))
+        except LinAlgError:
+            m["chol"] = None
+            m["XtX_inv"] = np.linalg.pinv(m["XtX"])
+            m["beta"] = m["XtX_inv"] @ m["Xty"]
+
+        m["meat"] = np.zeros((k, k))
+        m["SSE"] = 0.0
 
-    cov = XtX_inv @ meat @ XtX_inv
-    se = np.sqrt(np.diag(cov))
-    tvals = beta / se
-    pvals = np.array([two_sided_pvalue(t) for t in tvals])
-    R2 = 1.0 - SSE / TSS
+    # =========================
+    # PASS 2: HC3
+    # =========================
+    for ci, chunk in enumerate(iter_design_chunks(design)):
+        for m in states:
+            yZ, X = model_xy(model_rows(chunk, ci, m), m)
+
+            e = yZ - X @ m["beta"]
+            m["SSE"] += (e * e).sum()
+
+            # h_i = x_i' (X'X)^-1 x_i = ||L^-1 x_i||^2 with X'X = L L'
+            if m["chol"] is not None:
+                z = solve_triangular(m["chol"][0], X.T, lower=True)
+                h = np.einsum("ji,ji->i", z, z)
+            else:
+                h = np.einsum("ij,jk,ik->i", X, m["XtX_inv"], X)
+            w = np.nan_to_num((e * e) / np.square(1.0 - h))
+            m["meat"] += (X * w[:, None]).T @ X
 
     rows = []
-    names = ["Intercept"] + x_names_ref
-    for i, name in enumerate(names):
-        rows.append({
-            "Dependent": dep_var,
-            "Model": model_label,
-            "Variable": name,
-            "Coef": float(beta[i]),
-            "SE": float(se[i]),
-            "t": float(tvals[i]),
-            "p": float(pvals[i]),
-            "N": int(N),
-            "R2": float(R2),
-        })
+    for m in states:
+        N = m["n"]
+        beta = m["beta"]
+        XtX_inv = m["XtX_inv"]
+
+        ybar = m["sumy"] / N
+        TSS = m["sumy2"] - N * ybar * ybar
+
+        cov = XtX_inv @ m["meat"] @ XtX_inv
+        se = np.sqrt(np.diag(cov))
+        tvals = beta / se
+        # Two-sided normal p-values; erfc stays accurate for large |t|
+        pvals = erfc(np.abs(tvals) / np.sqrt(2.0))
+        R2 = 1.0 - m["SSE"] / TSS
+
+        names = ["Intercept"] + m["x_names"]
+        for i, name in enumerate(names):
+            rows.append({
+                "Dependent": m["dep_var"],
+                "Model": m["label"],
+                "Variable": name,
+                "Coef": float(beta[i]),
+                "SE": float(se[i]),
+                "t": float(tvals[i]),
+                "p": float(pvals[i]),
+                "N": int(N),
+                "R2": float(R2),
+            })
 
     return rows
 
@@ -311,18 +451,20 @@ def streaming_ols_hc3(parquet_path, dep_var, x_vars, model_label):
 # Run all models
 # =========================================================
 
-all_results = []
-
+models = []
 for label, dep in DEP_MAP.items():
-    all_results += streaming_ols_hc3(
-        PARQUET_PATH, dep, GEN_VARS, "Generative"
-    )
-    all_results += streaming_ols_hc3(
-        PARQUET_PATH, dep, PERF_VARS, "Performative"
-    )
+    models.append((dep, GEN_VARS, "Generative"))
+    models.append((dep, PERF_VARS, "Performative"))
+
+# The design matrix (rows x len(DESIGN_COLS) float32) is scratch data:
+# it lives in a temporary directory that is deleted once all models are
+# estimated
+with tempfile.TemporaryDirectory(prefix="hc3_design_") as design_dir:
+    design = precompute_design(PARQUET_PATH, design_dir)
+    all_results = streaming_ols_hc3_multi(design, models)
+    del design
 
 df_out = pd.DataFrame(all_results)
-df_out.to_csv(OUT_FILE, index=False)
+pacsv.write_csv(pa.Table.from_pandas(df_out, preserve_index=False), OUT_FILE)
 
 print("✓ All tables generated:", OUT_FILE)
-
@@ -19,12 +19,15 @@ in a transparent and inspectable form.
 Note:
 - Figure 2b does not rely on additional raw data or alternative computations.
 - It is constructed by re-aggregating and normalizing the yearly outputs produced here.
+- The paper-level parquet is assumed to use ~100k-row row groups
+  (see method/rechunk_meta.py).
 """
 
 import os
-import csv
-from collections import defaultdict
 
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import pyarrow.dataset as ds
 
 
@@ -54,15 +57,21 @@ COLS = [
 ]
 
 
+# Indicators averaged by year
+VALUE_COLS = COLS[1:]
+
+# Per-batch aggregations: sum / non-null count per indicator
+BATCH_AGGS = [(v, agg) for v in VALUE_COLS for agg in ("sum", "count")]
+
+
 # =====================================================
 # Dataset initialization
 # =====================================================
 
 dataset = ds.dataset(PARQUET_PATH, format="parquet")
 
-# Accumulators for yearly aggregation
-sum_dict = defaultdict(lambda: defaultdict(float))
-count_dict = defaultdict(int)
+# Per-batch yearly partial aggregates
+yearly_parts = []
 
 
 # =====================================================
@@ -75,58 +84,47 @@ scanner = dataset.scanner(
 )
 
 for batch in scanner.to_batches():
-    cols = batch.to_pydict()
-    years = cols["sci_Year"]
+    # Numeric view of every column (years truncated to int as before)
+    table = pa.table(
+        {c: batch.column(c).cast(pa.float64()) for c in COLS}
+    )
+    table = table.set_column(
+        0, "sci_Year", pc.trunc(table["sci_Year"]).cast(pa.int32())
+    )
+    table = table.filter(pc.is_valid(table["sci_Year"]))
+
+    yearly_parts.append(table.group_by("sci_Year").aggregate(BATCH_AGGS))
 
-    for i, y in enumerate(years):
-        if y is None:
-            continue
 
-        year = int(float(y))
-        count_dict[year] += 1
+# =====================================================
+# Combine partial aggregates across batches
+# =====================================================
 
-        for v in [
-            "novelty_raw",
-            "consolidation_raw",
-            "Z_novelty",
-            "Z_consolidation",
-            "textual_disruption",
-            "sci_Disruption",
-        ]:
-            val = cols[v][i]
-            if val is not None:
-                sum_dict[year][v] += float(val)
+partial_cols = [f"{v}_{agg}" for v, agg in BATCH_AGGS]
+
+yearly = (
+    pa.concat_tables(yearly_parts)
+    .group_by("sci_Year")
+    .aggregate([(c, "sum") for c in partial_cols])
+    .sort_by("sci_Year")
+)
 
 
 # =====================================================
 # Write yearly means to CSV
 # =====================================================
 
-years_sorted = sorted(count_dict.keys())
-
-with open(OUT_CSV, "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow([
-        "year",
-        "novelty_raw",
-        "consolidation_raw",
-        "Z_novelty",
-        "Z_consolidation",
-        "textual_disruption",
-        "sci_Disruption",
-    ])
-
-    for y in years_sorted:
-        n = count_dict[y]
-        writer.writerow([
-            y,
-            sum_dict[y]["novelty_raw"] / n if n else None,
-            sum_dict[y]["consolidation_raw"] / n if n else None,
-            sum_dict[y]["Z_novelty"] / n if n else None,
-            sum_dict[y]["Z_consolidation"] / n if n else None,
-            sum_dict[y]["textual_disruption"] / n if n else None,
-            sum_dict[y]["sci_Disruption"] / n if n else None,
-        ])
+means = {
+    v: pc.if_else(
+        pc.greater(yearly[f"{v}_count_sum"], 0),
+        pc.divide(yearly[f"{v}_sum_sum"], yearly[f"{v}_count_sum"]),
+        None,
+    )
+    for v in VALUE_COLS
+}
+
+out = pa.table({"year": yearly["sci_Year"], **means})
+pacsv.write_csv(out, OUT_CSV)
 
 print("SUCCESS: Figure 2 yearly aggregates written to:")
 print(OUT_CSV)
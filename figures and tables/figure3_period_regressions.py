@@ -27,6 +27,9 @@ Author:
 import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 import statsmodels.api as sm
 
 import matplotlib
@@ -44,7 +47,7 @@ OUT_PNG   = "outputs/figure3_forestplot_citation_all.png"
 os.makedirs(os.path.dirname(OUT_CSV), exist_ok=True)
 
 # =========================================================
-# 2. Load required columns only
+# 2. Open dataset (columns and periods are pushed down to Arrow)
 # =========================================================
 
 COLS = [
@@ -59,25 +62,20 @@ COLS = [
     "sci_Reference_Count",
 ]
 
-print("Loading data...")
-df = pd.read_parquet(DATA_PATH, columns=COLS)
-print(f"Rows loaded: {len(df):,}")
+print("Opening dataset...")
+dataset = ds.dataset(DATA_PATH, format="parquet")
 
-# =========================================================
-# 3. Type conversion
-# =========================================================
+# Compare years natively when stored as numbers; fall back to a cast
+# for string-typed year columns.
+YEAR_FIELD = ds.field("sci_Year")
+_year_type = dataset.schema.field("sci_Year").type
+if not (pa.types.is_integer(_year_type) or pa.types.is_floating(_year_type)):
+    YEAR_FIELD = YEAR_FIELD.cast(pa.float64())
 
-for c in COLS:
-    df[c] = pd.to_numeric(df[c], errors="coerce")
-
-# =========================================================
-# 4. Dependent variable & controls
-# =========================================================
-
-df["DV"] = np.log1p(df["sci_Citation_Count"])
-df["log_team"] = np.log1p(df["sci_Team_Size"])
-df["log_inst"] = np.log1p(df["sci_Institution_Count"])
-df["log_refs"] = np.log1p(df["sci_Reference_Count"])
+# Rows with no null (or NaN) in any required column
+COMPLETE_ROWS = ~ds.field(COLS[0]).is_null(nan_is_null=True)
+for c in COLS[1:]:
+    COMPLETE_ROWS &= ~ds.field(c).is_null(nan_is_null=True)
 
 TEXTUAL_VARS = [
     "Z_novelty",
@@ -88,8 +86,36 @@ TEXTUAL_VARS = [
 
 CONTROLS = ["log_team", "log_inst", "log_refs"]
 
+
+def load_study_rows(start, end):
+    """
+    Read all rows in [start, end] in one scan and build DV and controls.
+
+    The meta-table is not sorted by year, so a filtered scan decodes the
+    whole file; periods are therefore split from this one table in memory
+    rather than scanned separately.
+    """
+    # Incomplete rows are dropped inside the Arrow scan (validity bitmaps)
+    df = dataset.to_table(
+        columns=COLS,
+        filter=(YEAR_FIELD >= start) & (YEAR_FIELD <= end) & COMPLETE_ROWS,
+    ).to_pandas()
+
+    # Type conversion
+    for c in COLS:
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    # Dependent variable & controls
+    df["DV"] = np.log1p(df["sci_Citation_Count"])
+    df["log_team"] = np.log1p(df["sci_Team_Size"])
+    df["log_inst"] = np.log1p(df["sci_Institution_Count"])
+    df["log_refs"] = np.log1p(df["sci_Reference_Count"])
+
+    # Guards against values coerced to NaN from malformed strings
+    return df[["sci_Year", "DV"] + TEXTUAL_VARS + CONTROLS].dropna()
+
 # =========================================================
-# 5. Period definitions
+# 3. Period definitions
 # =========================================================
 
 PERIODS = {
@@ -100,18 +126,20 @@ PERIODS = {
 }
 
 # =========================================================
-# 6. Run period-specific regressions
+# 4. Run period-specific regressions
 # =========================================================
 
 print("Running period-specific regressions...")
 results = []
 
+study = load_study_rows(
+    min(start for start, _ in PERIODS.values()),
+    max(end for _, end in PERIODS.values()),
+)
+
 for label, (start, end) in PERIODS.items():
 
-    sub = df[
-        (df["sci_Year"] >= start) &
-        (df["sci_Year"] <= end)
-    ][["DV"] + TEXTUAL_VARS + CONTROLS].dropna()
+    sub = study[study["sci_Year"].between(start, end)]
 
     print(f"{label}: N = {len(sub):,}")
 
@@ -132,15 +160,15 @@ for label, (start, end) in PERIODS.items():
         })
 
 # =========================================================
-# 7. Save regression results
+# 5. Save regression results
 # =========================================================
 
 res_df = pd.DataFrame(results)
-res_df.to_csv(OUT_CSV, index=False)
+pacsv.write_csv(pa.Table.from_pandas(res_df, preserve_index=False), OUT_CSV)
 print("Saved regression table:", OUT_CSV)
 
 # =========================================================
-# 8. Plot Figure 3 (forest plot)
+# 6. Plot Figure 3 (forest plot)
 # =========================================================
 
 period_order = ["1900–1945", "1946–1980", "1981–2000", "2001–2021"]
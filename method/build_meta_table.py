@@ -22,8 +22,11 @@ NOTE:
   platform; this public version focuses on methodological transparency.
 """
 
+import argparse
+
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pv
 import pyarrow.parquet as pq
 
 
@@ -31,17 +34,18 @@ import pyarrow.parquet as pq
 # DOI normalization
 # =====================================================
 
-def normalize_doi(doi):
+def normalize_doi_series(s):
     """
     Standardize DOI strings to enable reliable cross-database matching.
+
+    Each value is lowercased and stripped, doi.org URL and "doi:" markers
+    are removed, and empty results become NA; all steps run as vectorized
+    string kernels over the whole column.
     """
-    if pd.isna(doi):
-        return None
-    x = str(doi).lower().strip()
-    x = x.replace("https://doi.org/", "")
-    x = x.replace("http://doi.org/", "")
-    x = x.replace("doi:", "")
-    return x if x else None
+    s = s.astype(STR).str.lower().str.strip()
+    for prefix in ("https://doi.org/", "http://doi.org/", "doi:"):
+        s = s.str.replace(prefix, "", regex=False)
+    return s.where(s.str.len() > 0)
 
 
 # =====================================================
@@ -58,6 +62,44 @@ sci_file = f"{SCISCINET_DIR}/SciSciNet_Papers.tsv"
 dc_file  = f"{SCISCINET_DIR}/pid_dc_summary.csv"
 dr_file  = f"{SCISCINET_DIR}/pid_dr_summary.csv"
 
+# Parquet is the analysis format; the gzip CSV copy is opt-in
+parser = argparse.ArgumentParser(description="Build the unified meta-table.")
+parser.add_argument(
+    "--csv",
+    action="store_true",
+    help="also write a gzip-compressed CSV copy (meta_table.csv.gz)",
+)
+args = parser.parse_args()
+
+# Arrow-backed strings: one shared buffer per column instead of a
+# separate Python object per value (IDs, DOIs)
+STR = "string[pyarrow]"
+
+# Numeric columns are read as strings and coerced, so a malformed or
+# float-formatted cell (e.g. "3.0" in a count column) becomes NaN rather
+# than aborting the load; float32 holds counts and years exactly. The
+# remaining SciSciNet columns stay strings.
+SCI_NUMERIC = {
+    "Year": "float32",
+    "C10": "float32",
+    "C5": "float32",
+    "Citation_Count": "float32",
+    "Reference_Count": "float32",
+    "Team_Size": "float32",
+    "Institution_Count": "float32",
+    "Disruption": "float32",
+}
+
+DISRUPTION_NUMERIC = {"Value": "float32"}
+
+
+def coerce_numeric(df, dtypes):
+    """Parse the given string columns as numbers (invalid → NaN)."""
+    for c, dtype in dtypes.items():
+        if c in df:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(dtype)
+    return df
+
 
 # =====================================================
 # Step 1: Load SciSciNet metadata (DOI → full record)
@@ -65,67 +107,85 @@ dr_file  = f"{SCISCINET_DIR}/pid_dr_summary.csv"
 
 print("Loading SciSciNet metadata...")
 
-sci_doi_map = {}
-sci_cols = None
-
-for chunk in pd.read_csv(sci_file, sep="\t", dtype=str, chunksize=200_000):
-    chunk["DOI"] = chunk["DOI"].apply(normalize_doi)
-
-    if sci_cols is None:
-        sci_cols = list(chunk.columns)
-
-    sub = chunk.dropna(subset=["DOI"])
-    for _, row in sub.iterrows():
-        sci_doi_map[row["DOI"]] = row.to_dict()
-
-print("SciSciNet DOI records:", len(sci_doi_map))
+# Parsed once with Arrow's multithreaded reader, straight from a memory
+# map of the TSV (blocks are zero-copy slices of the OS page cache
+# rather than copies into read buffers)
+with open(sci_file, encoding="utf-8") as f:
+    sci_header = f.readline().rstrip("\r\n").split("\t")
+
+with pa.memory_map(sci_file, "r") as src:
+    sci_tbl = pv.read_csv(
+        src,
+        parse_options=pv.ParseOptions(delimiter="\t"),
+        convert_options=pv.ConvertOptions(
+            column_types={c: pa.string() for c in sci_header},
+            strings_can_be_null=True,
+        ),
+    )
+sci_all = sci_tbl.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+del sci_tbl
+
+coerce_numeric(sci_all, SCI_NUMERIC)
+sci_all["DOI"] = normalize_doi_series(sci_all["DOI"])
+sci_cols = list(sci_all.columns)
+
+# One record per DOI (last occurrence wins), indexed for vectorized lookup
+sci_df = (
+    sci_all.dropna(subset=["DOI"])
+    .drop_duplicates("DOI", keep="last")
+    .set_index("DOI", drop=False)
+)
+
+print("SciSciNet DOI records:", len(sci_df))
 
 
 # =====================================================
 # Step 2: SciSciNet PaperID → DOI
 # =====================================================
 
-sci_pid_to_doi = {}
-
-for chunk in pd.read_csv(sci_file, sep="\t", dtype=str, chunksize=200_000):
-    doi = chunk["DOI"].apply(normalize_doi)
-    for pid, d in zip(chunk["PaperID"], doi):
-        if d:
-            sci_pid_to_doi[pid] = d
+# Derived from the same parsed table (no second pass over the TSV)
+sci_pid_to_doi = (
+    sci_all[["PaperID", "DOI"]]
+    .dropna()
+    .drop_duplicates("PaperID", keep="last")
+    .set_index("PaperID")["DOI"]
+)
+del sci_all
 
 
 # =====================================================
-# Step 3: Load citation disruption (dc)
+# Steps 3-4: Load citation disruption (dc, dr)
 # =====================================================
 
-print("Loading dc summary...")
-
-dc_raw = pd.read_csv(dc_file, dtype=str)
-dc_map = {}
-
-for _, row in dc_raw.iterrows():
-    pid = row["PaperID"]
-    if pid in sci_pid_to_doi:
-        dc_map[sci_pid_to_doi[pid]] = row["Value"]
-
-print("dc mapped:", len(dc_map))
-
-
-# =====================================================
-# Step 4: Load citation disruption (dr)
-# =====================================================
+def load_disruption(paths):
+    """
+    Map PaperID-level summaries (PaperID, Value) onto SciSciNet DOIs.
 
-print("Loading dr summary...")
+    All summaries are stacked and resolved to DOIs in one lookup; the
+    result has one column per summary (last occurrence per DOI within
+    each file wins).
+    """
+    raw = pd.concat(
+        {
+            name: coerce_numeric(pd.read_csv(path, dtype=STR), DISRUPTION_NUMERIC)
+            for name, path in paths.items()
+        },
+        names=["metric", None],
+    ).reset_index(level="metric")
+    raw["doi"] = raw["PaperID"].map(sci_pid_to_doi)
+    return (
+        raw.dropna(subset=["doi"])
+        .drop_duplicates(["metric", "doi"], keep="last")
+        .pivot(index="doi", columns="metric", values="Value")
+        .reindex(columns=list(paths))
+    )
 
-dr_raw = pd.read_csv(dr_file, dtype=str)
-dr_map = {}
+print("Loading dc / dr summaries...")
 
-for _, row in dr_raw.iterrows():
-    pid = row["PaperID"]
-    if pid in sci_pid_to_doi:
-        dr_map[sci_pid_to_doi[pid]] = row["Value"]
+disruption = load_disruption({"dc": dc_file, "dr": dr_file})
 
-print("dr mapped:", len(dr_map))
+print("dc mapped:", disruption["dc"].count())
+print("dr mapped:", disruption["dr"].count())
 
 
 # =====================================================
@@ -134,24 +194,32 @@ print("dr mapped:", len(dr_map))
 
 print("Loading OpenAlex paper identifiers...")
 
-pid_to_doi = {}
+pid_parts = []
+
+for chunk in pd.read_csv(
+    papers_file, usecols=["PaperID", "DOI"], dtype=STR, chunksize=300_000
+):
+    chunk["DOI"] = normalize_doi_series(chunk["DOI"])
+    pid_parts.append(chunk[["PaperID", "DOI"]].dropna())
 
-for chunk in pd.read_csv(papers_file, dtype=str, chunksize=300_000):
-    chunk["DOI"] = chunk["DOI"].apply(normalize_doi)
-    for pid, doi in zip(chunk["PaperID"], chunk["DOI"]):
-        if doi:
-            pid_to_doi[pid] = doi
+pid_to_doi = (
+    pd.concat(pid_parts, ignore_index=True)
+    .drop_duplicates("PaperID", keep="last")
+    .set_index("PaperID")["DOI"]
+)
+del pid_parts
 
 print("OpenAlex PID → DOI:", len(pid_to_doi))
 
 
 # =====================================================
-# Step 6: Build unified meta-table
+# Step 6: Build and stream unified meta-table
 # =====================================================
 
 print("Building unified meta-table...")
 
-rows = []
+OUT_PARQUET = "meta_table.parquet"
+OUT_CSV = "meta_table.csv.gz"
 
 textual_cols = [
     "PaperID", "new_word", "new_word_reuse", "new_phrase", "new_phrase_reuse",
@@ -163,46 +231,103 @@ textual_cols = [
     "n_words", "n_phrases", "has_abstract"
 ]
 
-for chunk in pd.read_csv(textual_file, dtype=str, chunksize=200_000):
-    for _, row in chunk.iterrows():
-        pid = row["PaperID"]
-        if pid not in pid_to_doi:
-            continue
-
-        doi = pid_to_doi[pid]
-        new_row = {}
-
-        for col in textual_cols:
-            new_row[col] = row.get(col, None)
-
-        new_row["doi"] = doi
-        new_row["openalex_pid"] = pid
-
-        if doi in sci_doi_map:
-            for col, val in sci_doi_map[doi].items():
-                new_row[f"sci_{col}"] = val
-        else:
-            for col in sci_cols:
-                new_row[f"sci_{col}"] = None
-
-        new_row["dc"] = dc_map.get(doi, None)
-        new_row["dr"] = dr_map.get(doi, None)
-
-        rows.append(new_row)
-
-print("Total rows in meta-table:", len(rows))
+# Indicators are coerced to float64 in every chunk (same Parquet schema
+# throughout); IDs and the has_abstract flag are kept as read
+textual_numeric = {
+    c: "float64" for c in textual_cols if c not in ("PaperID", "has_abstract")
+}
+
+# Integer-coded DOI join: every DOI that can carry SciSciNet data
+# (records, dc, dr) is in the unique sci_df index, so rows are looked up
+# by their integer code in that index. Code -1 (DOI not in SciSciNet)
+# selects a trailing all-missing row.
+doi_index = sci_df.index
+n_sci = len(doi_index)
+
+def by_code(obj):
+    """Align a DOI-indexed Series/DataFrame to doi_index codes (+ missing row)."""
+    return obj.reindex(doi_index).reset_index(drop=True).reindex(
+        range(n_sci + 1)
+    )
+
+sci_meta = by_code(sci_df[sci_cols].add_prefix("sci_"))
+disruption_by_code = by_code(disruption)
+dc_by_code = disruption_by_code["dc"].to_numpy()
+dr_by_code = disruption_by_code["dr"].to_numpy()
+
+# Canonical DOI resolution is shared across passes: every OpenAlex DOI
+# is resolved to its doi_index code once, here, so the textual pass only
+# looks up PaperIDs and never re-hashes DOI strings per row.
+pid_index = pid_to_doi.index
+pid_code = doi_index.get_indexer(pid_to_doi)
+
+# Merged chunks are written as they are built (peak memory ~ one chunk).
+# The Parquet schema is fixed by the first non-empty chunk; the layout
+# matches rechunk_meta.py. With --csv, the same Arrow table is also
+# written through Arrow's CSV writer into a gzip stream (GIL released).
+writer = None
+csv_sink = None
+csv_writer = None
+schema = None
+n_rows = 0
+n_cols = 0
+
+for chunk in pd.read_csv(textual_file, dtype=STR, chunksize=200_000):
+    coerce_numeric(chunk, textual_numeric)
+    pos = pid_index.get_indexer(chunk["PaperID"])
+    keep = pos >= 0
+    if not keep.any():
+        continue
+    pos = pos[keep]
+
+    part = chunk.loc[keep].reindex(columns=textual_cols)
+    part["doi"] = pid_to_doi.array.take(pos)
+    part["openalex_pid"] = part["PaperID"]
+    part = part.reset_index(drop=True)
+
+    codes = pid_code[pos]
+
+    sci_block = sci_meta.iloc[codes].reset_index(drop=True)
+    part = pd.concat([part, sci_block], axis=1)
+
+    part["dc"] = dc_by_code[codes]
+    part["dr"] = dr_by_code[codes]
+
+    if writer is None:
+        schema = pa.Table.from_pandas(part, preserve_index=False).schema
+        writer = pq.ParquetWriter(
+            OUT_PARQUET,
+            schema,
+            compression="zstd",
+            write_page_index=True,
+        )
+        if args.csv:
+            csv_sink = pa.CompressedOutputStream(OUT_CSV, "gzip")
+            csv_writer = pv.CSVWriter(csv_sink, schema)
+
+    table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+    writer.write_table(table, row_group_size=100_000)
+    if csv_writer is not None:
+        csv_writer.write_table(table)
+
+    n_rows += len(part)
+    n_cols = part.shape[1]
+
+if writer is not None:
+    writer.close()
+if csv_writer is not None:
+    csv_writer.close()
+    csv_sink.close()
+
+print("Total rows in meta-table:", n_rows)
 
 
 # =====================================================
 # Step 7: Output
 # =====================================================
 
-df = pd.DataFrame(rows)
-
-df.to_parquet("meta_table.parquet")
-df.to_csv("meta_table.csv.gz", index=False)
-
 print("Saved outputs:")
-print("  meta_table.parquet")
-print("  meta_table.csv.gz")
-print("Shape:", df.shape)
+print("  " + OUT_PARQUET)
+if args.csv:
+    print("  " + OUT_CSV)
+print("Shape:", (n_rows, n_cols))
@@ -24,13 +24,80 @@ import pandas as pd
 import numpy as np
 import os
 
+import pyarrow as pa
+import pyarrow.csv as pv
+
 # ==========================================================
 # Part 0. Utility functions
 # ==========================================================
 
 def zscore(series: pd.Series) -> pd.Series:
-    """Standard z-score transformation."""
-    return (series - series.mean()) / series.std()
+    """
+    Standard z-score transformation (NaN-skipping, ddof=1, as pandas).
+
+    Mean and variance come from one pass of sum and sum of squares;
+    values are shifted by the first observation so the subtraction
+    s2 - s*s/n does not cancel for large, tightly clustered values.
+    """
+    a = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    d = a[~np.isnan(a)]
+    n = d.size
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = d[0] if n else np.nan
+        d = d - shift
+        s = d.sum()
+        s2 = np.dot(d, d)
+        mean = shift + s / n
+        std = np.sqrt((s2 - s * s / n) / (n - 1))
+        z = (a - mean) / std
+
+    return pd.Series(z, index=series.index, name=series.name)
+
+
+def group_mean(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of values per integer group code (NaN for empty groups)."""
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+def iter_csv_chunks(reader: pv.CSVStreamingReader, chunk_size: int):
+    """Regroup a streaming CSV reader into tables of exactly chunk_size rows."""
+    parts, n = [], 0
+    for batch in reader:
+        while batch.num_rows:
+            take = min(chunk_size - n, batch.num_rows)
+            parts.append(batch.slice(0, take))
+            batch = batch.slice(take)
+            n += take
+            if n == chunk_size:
+                yield pa.Table.from_batches(parts)
+                parts, n = [], 0
+    if n:
+        yield pa.Table.from_batches(parts)
+
+
+def lookup_word_freq(
+    words: pa.ChunkedArray,
+    vocab: pd.Index,
+    freq_arr: np.ndarray
+) -> np.ndarray:
+    """
+    Frequencies for a dictionary-encoded word column.
+
+    Each dictionary is resolved against vocab once; rows then gather
+    through their dictionary indices. Null words get the 1.0 fallback.
+    """
+    parts = []
+    for arr in words.chunks:
+        dict_freq = np.append(
+            freq_arr[vocab.get_indexer(arr.dictionary.to_pandas())],
+            1.0
+        )
+        parts.append(dict_freq[arr.indices.fill_null(-1).to_numpy()])
+    return np.concatenate(parts) if parts else np.empty(0)
 
 
 # ==========================================================
@@ -40,13 +107,16 @@ def zscore(series: pd.Series) -> pd.Series:
 def compute_textual_novelty(df: pd.DataFrame) -> pd.Series:
     """
     Ex ante textual novelty: introduction of new linguistic material.
+
+    Evaluated as one expression (fused by numexpr when it is installed,
+    plain pandas addition otherwise).
     """
-    return (
-        df["new_word"]
-        + df["new_phrase"]
-        + df["new_word_comb"]
-        + df["new_phrase_comb"]
-        + df["semantic_distance"]
+    return df.eval(
+        "new_word"
+        " + new_phrase"
+        " + new_word_comb"
+        " + new_phrase_comb"
+        " + semantic_distance"
     )
 
 
@@ -57,12 +127,14 @@ def compute_textual_novelty(df: pd.DataFrame) -> pd.Series:
 def compute_textual_consolidation(df: pd.DataFrame) -> pd.Series:
     """
     Ex post textual consolidation: subsequent reuse of introduced elements.
+
+    Evaluated as one expression, as in compute_textual_novelty.
     """
-    return (
-        df["new_word_reuse"]
-        + df["new_phrase_reuse"]
-        + df["new_word_comb_reuse"]
-        + df["new_phrase_comb_reuse"]
+    return df.eval(
+        "new_word_reuse"
+        " + new_phrase_reuse"
+        " + new_word_comb_reuse"
+        " + new_phrase_comb_reuse"
     )
 
 
@@ -87,59 +159,94 @@ def compute_textual_disruption(
 # Part 4. Combinational novelty (Uzzi-style, chunked)
 # ==========================================================
 
+def chunk_paper_means(
+    chunk: pa.Table,
+    vocab: pd.Index,
+    freq_arr: np.ndarray
+) -> tuple:
+    """
+    First aggregation for one chunk: mean Uzzi z-score per PaperID.
+
+    Returns the chunk's distinct PaperIDs and their mean z-scores.
+    """
+    # Marginal frequencies
+    f1 = lookup_word_freq(chunk.column("Word1"), vocab, freq_arr)
+    f2 = lookup_word_freq(chunk.column("Word2"), vocab, freq_arr)
+
+    # Observed pair frequency (Reuse)
+    f_pair = chunk.column("Reuse").to_numpy()
+
+    # Expected frequency
+    expected = np.sqrt(f1 * f2)
+
+    # Uzzi-style z-score
+    z = (f_pair - expected) / (expected + 1e-6)
+
+    codes, papers = pd.factorize(chunk.column("PaperID").to_pandas())
+    ok = (codes >= 0) & ~np.isnan(z)
+
+    return papers, group_mean(codes[ok], z[ok], len(papers))
+
+
 def compute_combinational_novelty_uzzi(
-    word_freq: dict,
+    word_freq: pd.Series,
     path_word_combs: str,
     chunk_size: int = 2_000_000
 ) -> pd.DataFrame:
     """
     Compute Uzzi-style combinational novelty at the paper level.
 
+    word_freq maps word → frequency (a Series such as
+    Word.value_counts(), or a plain dict).
+
     This implementation strictly follows the original two-stage aggregation logic:
     (1) aggregation within chunks
     (2) aggregation across chunks
     """
 
-    paper_uzzi_parts = []
+    # Word frequencies as an array indexed by word code; the trailing
+    # slot (code -1, word not in word_freq) holds the fallback of 1.0
+    word_freq = pd.Series(word_freq, dtype=float)
+    vocab = word_freq.index
+    freq_arr = np.append(word_freq.to_numpy(), 1.0)
+
+    paper_ids = []
+    paper_means = []
     chunk_id = 0
 
-    for chunk in pd.read_csv(path_word_combs, chunksize=chunk_size):
+    # Multithreaded Arrow reader; words stay dictionary-encoded and
+    # Reuse (integer counts, exact in float32) is read at half width
+    word_type = pa.dictionary(pa.int32(), pa.string())
+    reader = pv.open_csv(
+        path_word_combs,
+        convert_options=pv.ConvertOptions(
+            column_types={
+                "Word1": word_type,
+                "Word2": word_type,
+                "Reuse": pa.float32(),
+            },
+            strings_can_be_null=True,
+        ),
+    )
+
+    for chunk in iter_csv_chunks(reader, chunk_size):
         chunk_id += 1
         print(f"Processing combination chunk {chunk_id}...")
 
-        # Marginal frequencies
-        f1 = chunk["Word1"].map(word_freq).fillna(1.0).astype(float)
-        f2 = chunk["Word2"].map(word_freq).fillna(1.0).astype(float)
-
-        # Observed pair frequency (Reuse)
-        f_pair = chunk["Reuse"].astype(float)
-
-        # Expected frequency
-        expected = np.sqrt(f1 * f2)
-
-        # Uzzi-style z-score
-        z = (f_pair - expected) / (expected + 1e-6)
-
-        chunk["zscore"] = z
-
         # First aggregation: within chunk
-        paper_z = (
-            chunk
-            .groupby("PaperID")["zscore"]
-            .mean()
-            .reset_index()
-        )
-
-        paper_uzzi_parts.append(paper_z)
+        papers, means = chunk_paper_means(chunk, vocab, freq_arr)
+        paper_ids.append(papers)
+        paper_means.append(means)
 
     # Second aggregation: across chunks
-    paper_uzzi = (
-        pd.concat(paper_uzzi_parts, ignore_index=True)
-        .groupby("PaperID")["zscore"]
-        .mean()
-        .reset_index()
-        .rename(columns={"zscore": "combo_novelty"})
-    )
+    codes, papers = pd.factorize(np.concatenate(paper_ids), sort=True)
+    means = np.concatenate(paper_means)
+    ok = ~np.isnan(means)
+
+    paper_uzzi = pd.DataFrame({
+        "PaperID": papers,
+        "combo_novelty": group_mean(codes[ok], means[ok], len(papers)),
+    })
 
     return paper_uzzi
 
@@ -151,28 +258,38 @@ def compute_combinational_novelty_uzzi(
 def run_pipeline(
     metrics_df: pd.DataFrame,
     word_freq_df: pd.DataFrame,
-    path_word_combs: str
+    path_word_combs: str,
+    word_freq: pd.Series = None
 ) -> pd.DataFrame:
     """
     Demonstration pipeline assembling all textual innovation indicators.
-    """
 
-    df = metrics_df.copy()
-
-    # Textual novelty
-    df["novelty_raw"] = compute_textual_novelty(df)
+    word_freq may be passed in (e.g. word_freq_df["Word"].value_counts())
+    to reuse one frequency table across several runs on the same corpus.
+    """
 
-    # Textual consolidation
-    df["consolidation_raw"] = compute_textual_consolidation(df)
+    # New columns are attached with assign, which leaves metrics_df
+    # untouched. Under pandas copy-on-write (pandas >= 3) the existing
+    # columns are shared rather than copied; on older pandas assign
+    # deep-copies internally, matching the former explicit .copy()
+    df = metrics_df.assign(
+        # Textual novelty
+        novelty_raw=compute_textual_novelty(metrics_df),
+        # Textual consolidation
+        consolidation_raw=compute_textual_consolidation(metrics_df),
+    )
 
     # Textual disruption
-    df["textual_disruption"] = compute_textual_disruption(
-        df["novelty_raw"],
-        df["consolidation_raw"]
+    df = df.assign(
+        textual_disruption=compute_textual_disruption(
+            df["novelty_raw"],
+            df["consolidation_raw"]
+        )
     )
 
-    # Build word frequency dictionary
-    word_freq = word_freq_df["Word"].value_counts().to_dict()
+    # Word frequency table (computed once unless supplied by the caller)
+    if word_freq is None:
+        word_freq = word_freq_df["Word"].value_counts()
 
     # Combinational novelty
     combo_df = compute_combinational_novelty_uzzi(
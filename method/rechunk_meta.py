@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rewrite the meta-table with a streaming-friendly Parquet layout
+-----------------------------------------------------------------
+
+The analysis scripts in /figures and tables/ stream meta_table.parquet
+batch by batch. With writer defaults (~1M rows per row group) every
+decoded row group is large.
+
+This one-time utility rewrites an existing meta-table with:
+- 100,000-row row groups (lower peak memory per decoded batch)
+- a page index
+- zstd compression with dictionary encoding
+
+Row order is preserved. The table is not sorted by sci_Year, so each
+row group still spans the full year range and year filters cannot skip
+row groups.
+
+The input is streamed; the full table is never held in memory.
+"""
+
+import pyarrow.parquet as pq
+
+
+# =====================================================
+# Paths (to be configured by user)
+# =====================================================
+
+IN_PATH  = "meta_table.parquet"
+OUT_PATH = "meta_table.rechunked.parquet"
+
+ROW_GROUP_SIZE = 100_000
+
+
+# =====================================================
+# Stream rewrite
+# =====================================================
+
+pf = pq.ParquetFile(IN_PATH)
+
+print("Input row groups:", pf.num_row_groups)
+
+with pq.ParquetWriter(
+    OUT_PATH,
+    pf.schema_arrow,
+    compression="zstd",
+    use_dictionary=True,
+    write_page_index=True,
+) as writer:
+    for batch in pf.iter_batches(batch_size=ROW_GROUP_SIZE):
+        writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
+
+out = pq.ParquetFile(OUT_PATH)
+
+print("Saved:", OUT_PATH)
+print("Output row groups:", out.num_row_groups)
+print("Rows:", out.metadata.num_rows)